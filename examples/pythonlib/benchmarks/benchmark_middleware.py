@@ -5,10 +5,14 @@ This module provides comprehensive benchmarks to ensure the middleware
 implementation performs at the level expected of a top 0.1% Python library.
 """
 
+import array
 import asyncio
+import hashlib
+import multiprocessing
+import os
 import time
 import statistics
-from typing import List, Callable, Dict, Any
+from typing import List, Callable, Dict, Any, Optional
 import functools
 
 # Import from parent directory
@@ -16,162 +20,166 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.mware import middleware, Context
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional benchmark extra
+    np = None
+
+from src.mware import middleware, use_uvloop, Context
 from src.mware.decorators import timing, cache, retry
 
+# Payload for simulated handler work: a fixed CPU cost that, unlike a short
+# asyncio.sleep(), does not depend on the event loop's timer resolution.
+WORK = b'x' * 256
+
+
+def _summarize(times: array.array) -> Dict[str, float]:
+    """Reduce nanosecond samples to summary statistics in seconds."""
+    if np is not None:
+        arr = np.frombuffer(times, dtype=np.int64)
+        return {
+            'mean': float(arr.mean()) / 1e9,
+            'median': float(np.median(arr)) / 1e9,
+            'std_dev': float(arr.std(ddof=1)) / 1e9 if len(arr) > 1 else 0,
+            'min': int(arr.min()) / 1e9,
+            'max': int(arr.max()) / 1e9,
+            'total': int(arr.sum()) / 1e9,
+        }
+    
+    return {
+        'mean': statistics.mean(times) / 1e9,  # Convert to seconds
+        'median': statistics.median(times) / 1e9,
+        'std_dev': statistics.stdev(times) / 1e9 if len(times) > 1 else 0,
+        'min': min(times) / 1e9,
+        'max': max(times) / 1e9,
+        'total': sum(times) / 1e9,
+    }
+
+
+def _timer_overhead(samples: int = 1000) -> int:
+    """Estimate the cost of one back-to-back perf_counter_ns() pair in ns."""
+    pc = time.perf_counter_ns
+    best = None
+    for _ in range(samples):
+        start = pc()
+        elapsed = pc() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best or 0
+
 
 class BenchmarkSuite:
     """Run performance benchmarks for middleware operations."""
     
-    def __init__(self, iterations: int = 10000):
+    def __init__(self, iterations: int = 10000, batch_size: int = 100,
+                 processes: Optional[int] = 1):
         self.iterations = iterations
+        self.batch_size = batch_size
+        self.processes = processes
         self.results: Dict[str, Dict[str, float]] = {}
+        self.timer_overhead = _timer_overhead()
     
     async def benchmark_function(self, func: Callable, name: str, *args, **kwargs) -> Dict[str, float]:
-        """Benchmark a single function with multiple iterations."""
-        times = []
-        
-        # Warm up
-        for _ in range(min(100, self.iterations // 10)):
-            if asyncio.iscoroutinefunction(func):
-                await func(*args, **kwargs)
-            else:
-                func(*args, **kwargs)
-        
-        # Actual benchmark
-        for _ in range(self.iterations):
-            start = time.perf_counter_ns()
-            if asyncio.iscoroutinefunction(func):
+        """
+        Benchmark a single function with multiple iterations.
+        
+        Calls are timed in batches of ``batch_size`` so the clock read is
+        amortized, and the calibrated timer overhead is subtracted from each
+        batch. Every sample is therefore the mean per-call time of one batch.
+        """
+        batch = max(1, min(self.batch_size, self.iterations))
+        samples = max(1, self.iterations // batch)
+        overhead = self.timer_overhead
+        
+        # Contiguous int64 buffer: no list growth or boxed ints in the timed loop
+        times = array.array('q', bytes(8 * samples))
+        warmup = min(100, self.iterations // 10)
+
+        pc = time.perf_counter_ns
+
+        # Decide sync vs async once so the timed loop only contains the call
+        if asyncio.iscoroutinefunction(func):
+            # Warm up
+            for _ in range(warmup):
                 await func(*args, **kwargs)
-            else:
+
+            # Actual benchmark
+            for i in range(samples):
+                start = pc()
+                for _ in range(batch):
+                    await func(*args, **kwargs)
+                times[i] = max(0, pc() - start - overhead) // batch
+        else:
+            # Warm up
+            for _ in range(warmup):
                 func(*args, **kwargs)
-            times.append(time.perf_counter_ns() - start)
-        
-        results = {
-            'mean': statistics.mean(times) / 1e9,  # Convert to seconds
-            'median': statistics.median(times) / 1e9,
-            'std_dev': statistics.stdev(times) / 1e9 if len(times) > 1 else 0,
-            'min': min(times) / 1e9,
-            'max': max(times) / 1e9,
-            'total': sum(times) / 1e9,
-            'iterations': self.iterations
-        }
+
+            # Actual benchmark
+            for i in range(samples):
+                start = pc()
+                for _ in range(batch):
+                    func(*args, **kwargs)
+                times[i] = max(0, pc() - start - overhead) // batch
+
+        results = _summarize(times)
+        results['total'] *= batch
+        results['iterations'] = samples * batch
         
         self.results[name] = results
         return results
     
     async def run_all_benchmarks(self):
-        """Run all benchmark scenarios."""
+        """
+        Run all benchmark scenarios.
+        
+        Scenarios run in-process one after another by default, so the
+        "overhead vs raw" ratios compare numbers taken under the same
+        conditions. Pass ``processes=None`` (one worker per CPU) or a worker
+        count to run each scenario in its own spawned process concurrently;
+        that is faster, but workers compete for cores, so treat the overhead
+        ratios from such a run as rough.
+        """
         print(f"Running benchmarks with {self.iterations} iterations each...\n")
         
-        # Benchmark 1: Basic middleware overhead
-        print("1. Basic middleware overhead")
-        
-        async def raw_handler(ctx: Context):
-            return {"status": "ok"}
-        
-        @middleware
-        async def noop_middleware(ctx: Context, next):
-            return await next(ctx)
-        
-        @noop_middleware
-        async def wrapped_handler(ctx: Context):
-            return {"status": "ok"}
+        if self.processes == 1:
+            for bench in BENCHMARKS:
+                await bench(self)
+        else:
+            jobs = [(bench, self.iterations, self.batch_size) for bench in BENCHMARKS]
+            ctx = multiprocessing.get_context('spawn')
+            with ctx.Pool(self.processes or min(len(jobs), os.cpu_count() or 1)) as pool:
+                for results in pool.starmap(_run_one, jobs):
+                    self.results.update(results)
         
-        ctx = Context()
-        raw_results = await self.benchmark_function(raw_handler, "raw_handler", ctx)
-        wrapped_results = await self.benchmark_function(wrapped_handler, "single_middleware", ctx)
-        overhead = ((wrapped_results['mean'] - raw_results['mean']) / raw_results['mean']) * 100
+        r = self.results
+        raw = r['raw_handler']['mean']
+        overhead = ((r['single_middleware']['mean'] - raw) / raw) * 100
+        chain_overhead = ((r['triple_middleware']['mean'] - raw) / raw) * 100
         
-        print(f"  Raw handler: {raw_results['mean']*1e6:.2f} μs")
-        print(f"  With middleware: {wrapped_results['mean']*1e6:.2f} μs")
+        print("1. Basic middleware overhead")
+        print(f"  Raw handler: {raw*1e6:.2f} μs")
+        print(f"  With middleware: {r['single_middleware']['mean']*1e6:.2f} μs")
         print(f"  Overhead: {overhead:.1f}%\n")
         
-        # Benchmark 2: Multiple middleware chain
         print("2. Multiple middleware chain")
-        
-        @middleware
-        async def middleware1(ctx: Context, next):
-            ctx.data1 = True
-            return await next(ctx)
-        
-        @middleware
-        async def middleware2(ctx: Context, next):
-            ctx.data2 = True
-            return await next(ctx)
-        
-        @middleware
-        async def middleware3(ctx: Context, next):
-            ctx.data3 = True
-            return await next(ctx)
-        
-        @middleware1
-        @middleware2
-        @middleware3
-        async def chained_handler(ctx: Context):
-            return {"status": "ok", "data": ctx.data1 and ctx.data2 and ctx.data3}
-        
-        chained_results = await self.benchmark_function(chained_handler, "triple_middleware", Context())
-        chain_overhead = ((chained_results['mean'] - raw_results['mean']) / raw_results['mean']) * 100
-        
-        print(f"  Triple middleware: {chained_results['mean']*1e6:.2f} μs")
+        print(f"  Triple middleware: {r['triple_middleware']['mean']*1e6:.2f} μs")
         print(f"  Overhead vs raw: {chain_overhead:.1f}%\n")
         
-        # Benchmark 3: Built-in decorators
         print("3. Built-in decorators performance")
+        print(f"  Timing decorator: {r['timing_decorator']['mean']*1e6:.2f} μs")
+        print(f"  Cache (miss): {r['cache_miss']['mean']*1e6:.2f} μs")
+        print(f"  Cache (hit): {r['cache_hit']['mean']*1e6:.2f} μs")
+        print(f"  Cache speedup: {r['cache_miss']['mean']/r['cache_hit']['mean']:.1f}x")
+        print(f"  Retry decorator: {r['retry_decorator']['mean']*1e6:.2f} μs\n")
         
-        @timing
-        async def timed_handler(ctx: Context):
-            await asyncio.sleep(0.00001)  # Simulate small work
-            return {"status": "ok"}
-        
-        @cache(ttl=60)
-        async def cached_handler(ctx: Context, value: int):
-            await asyncio.sleep(0.00001)  # Simulate work
-            return {"value": value * 2}
-        
-        @retry(max_attempts=3)
-        async def retry_handler(ctx: Context):
-            return {"status": "ok"}
-        
-        timing_results = await self.benchmark_function(timed_handler, "timing_decorator", Context())
-        
-        # Cache benchmark - first call
-        ctx_cache = Context()
-        cache_miss_results = await self.benchmark_function(cached_handler, "cache_miss", ctx_cache, 42)
-        
-        # Cache benchmark - subsequent calls (should be faster)
-        cache_hit_results = await self.benchmark_function(cached_handler, "cache_hit", ctx_cache, 42)
-        
-        retry_results = await self.benchmark_function(retry_handler, "retry_decorator", Context())
-        
-        print(f"  Timing decorator: {timing_results['mean']*1e6:.2f} μs")
-        print(f"  Cache (miss): {cache_miss_results['mean']*1e6:.2f} μs")
-        print(f"  Cache (hit): {cache_hit_results['mean']*1e6:.2f} μs")
-        print(f"  Cache speedup: {cache_miss_results['mean']/cache_hit_results['mean']:.1f}x")
-        print(f"  Retry decorator: {retry_results['mean']*1e6:.2f} μs\n")
-        
-        # Benchmark 4: Context operations
         print("4. Context operations")
-        
-        def context_operations():
-            ctx = Context()
-            ctx.user_id = 123
-            ctx.session_id = "abc123"
-            ctx.metadata = {"key": "value"}
-            _ = ctx.user_id
-            _ = ctx.session_id
-            _ = ctx.metadata
-            return ctx
-        
-        context_results = await self.benchmark_function(context_operations, "context_operations")
-        print(f"  Context creation & access: {context_results['mean']*1e6:.2f} μs\n")
+        print(f"  Context creation & access: {r['context_operations']['mean']*1e6:.2f} μs\n")
         
         # Summary
         print("=== Performance Summary ===")
         print(f"Basic middleware overhead: {overhead:.1f}%")
-        print(f"Typical operation time: ~{wrapped_results['mean']*1e6:.0f} μs")
-        print(f"Context operations: ~{context_results['mean']*1e6:.0f} μs")
+        print(f"Typical operation time: ~{r['single_middleware']['mean']*1e6:.0f} μs")
+        print(f"Context operations: ~{r['context_operations']['mean']*1e6:.0f} μs")
         
         if overhead > 10:
             print("\n⚠️  WARNING: Middleware overhead exceeds 10% - optimization needed!")
@@ -222,6 +230,109 @@ class BenchmarkSuite:
             f.write("- Predictable performance with low variance\n")
 
 
+# Benchmark scenarios. These live at module level so spawned workers can
+# import them; each records its results on the suite it is given.
+
+async def bench_basic(suite: BenchmarkSuite) -> None:
+    """Basic middleware overhead."""
+    async def raw_handler(ctx: Context):
+        return {"status": "ok"}
+    
+    @middleware
+    async def noop_middleware(ctx: Context, next):
+        return await next(ctx)
+    
+    @noop_middleware
+    async def wrapped_handler(ctx: Context):
+        return {"status": "ok"}
+    
+    ctx = Context()
+    await suite.benchmark_function(raw_handler, "raw_handler", ctx)
+    await suite.benchmark_function(wrapped_handler, "single_middleware", ctx)
+
+
+async def bench_chain(suite: BenchmarkSuite) -> None:
+    """Multiple middleware chain."""
+    @middleware
+    async def middleware1(ctx: Context, next):
+        ctx.data1 = True
+        return await next(ctx)
+    
+    @middleware
+    async def middleware2(ctx: Context, next):
+        ctx.data2 = True
+        return await next(ctx)
+    
+    @middleware
+    async def middleware3(ctx: Context, next):
+        ctx.data3 = True
+        return await next(ctx)
+    
+    @middleware1
+    @middleware2
+    @middleware3
+    async def chained_handler(ctx: Context):
+        return {"status": "ok", "data": ctx.data1 and ctx.data2 and ctx.data3}
+    
+    await suite.benchmark_function(chained_handler, "triple_middleware", Context())
+
+
+async def bench_builtins(suite: BenchmarkSuite) -> None:
+    """Built-in decorators performance."""
+    @timing
+    async def timed_handler(ctx: Context):
+        await asyncio.sleep(0)  # Keep a suspension point
+        hashlib.blake2b(WORK).digest()  # Simulate small work
+        return {"status": "ok"}
+    
+    @cache(ttl=60)
+    async def cached_handler(ctx: Context, value: int):
+        await asyncio.sleep(0)
+        hashlib.blake2b(WORK).digest()  # Simulate work
+        return {"value": value * 2}
+    
+    @retry(max_attempts=3)
+    async def retry_handler(ctx: Context):
+        return {"status": "ok"}
+    
+    await suite.benchmark_function(timed_handler, "timing_decorator", Context())
+    
+    # Cache benchmark - first call
+    ctx_cache = Context()
+    await suite.benchmark_function(cached_handler, "cache_miss", ctx_cache, 42)
+    
+    # Cache benchmark - subsequent calls (should be faster)
+    await suite.benchmark_function(cached_handler, "cache_hit", ctx_cache, 42)
+    
+    await suite.benchmark_function(retry_handler, "retry_decorator", Context())
+
+
+async def bench_context(suite: BenchmarkSuite) -> None:
+    """Context operations."""
+    def context_operations():
+        ctx = Context()
+        ctx.user_id = 123
+        ctx.session_id = "abc123"
+        ctx.metadata = {"key": "value"}
+        _ = ctx.user_id
+        _ = ctx.session_id
+        _ = ctx.metadata
+        return ctx
+    
+    await suite.benchmark_function(context_operations, "context_operations")
+
+
+BENCHMARKS = (bench_basic, bench_chain, bench_builtins, bench_context)
+
+
+def _run_one(bench: Callable, iterations: int, batch_size: int) -> Dict[str, Dict[str, float]]:
+    """Worker entry point: run one scenario on a fresh suite and event loop."""
+    use_uvloop()
+    suite = BenchmarkSuite(iterations=iterations, batch_size=batch_size, processes=1)
+    asyncio.run(bench(suite))
+    return suite.results
+
+
 async def main():
     """Run the benchmark suite."""
     suite = BenchmarkSuite(iterations=10000)
@@ -231,4 +342,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    use_uvloop()
     asyncio.run(main())
\ No newline at end of file
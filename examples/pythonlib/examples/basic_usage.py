@@ -8,7 +8,8 @@ to create composable, type-safe middleware decorators.
 
 import asyncio
 import time
-from typing import Any, Dict, Optional
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
 
 from mware import middleware, Context
 
@@ -17,9 +18,9 @@ from mware import middleware, Context
 @middleware
 async def timing_middleware(ctx: Context, next) -> Any:
     """Track execution time of wrapped functions."""
-    start = time.time()
+    start = time.monotonic_ns()
     result = await next(ctx)
-    ctx.execution_time = time.time() - start
+    ctx.execution_time = (time.monotonic_ns() - start) / 1e9
     print(f"Function {ctx.func_name} took {ctx.execution_time:.3f} seconds")
     return result
 
@@ -52,13 +53,17 @@ async def logging_middleware(ctx: Context, next) -> Any:
 
 
 # Example 4: Caching middleware
-cache_store: Dict[str, Any] = {}
+cache_store: Dict[Any, Any] = {}
 
 @middleware
 async def cache_middleware(ctx: Context, next) -> Any:
     """Simple in-memory cache for function results."""
-    # Create cache key from function name and arguments
-    cache_key = f"{ctx.func_name}:{ctx.args}:{ctx.kwargs}"
+    # Key on the raw values; the dict hashes the tuple, no string formatting
+    try:
+        cache_key = (ctx.func_name, ctx.args, frozenset(ctx.kwargs.items()))
+        hash(cache_key)
+    except TypeError:  # list or dict arguments: fall back to a string key
+        cache_key = f"{ctx.func_name}:{ctx.args}:{ctx.kwargs}"
     
     # Check if result is already cached
     if cache_key in cache_store:
@@ -81,17 +86,19 @@ async def slow_function(n: int) -> int:
     return n * 2
 
 
+def _fib(n: int) -> int:
+    """Iterative fibonacci, kept free of async and middleware."""
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
 @logging_middleware
 @timing_middleware
 async def calculate_fibonacci(n: int) -> int:
-    """Calculate fibonacci number recursively."""
-    if n <= 1:
-        return n
-    
-    # In real code, you'd want to optimize this
-    fib1 = await calculate_fibonacci(n - 1)
-    fib2 = await calculate_fibonacci(n - 2)
-    return fib1 + fib2
+    """Calculate fibonacci number; middleware wraps the call, not the arithmetic."""
+    return _fib(n)
 
 
 @logging_middleware
@@ -112,27 +119,27 @@ async def get_user_data(user_id: int) -> Dict[str, Any]:
 # Example 6: Middleware with configuration
 def rate_limit(max_calls: int = 10, window_seconds: int = 60):
     """Factory for creating rate limiting middleware."""
-    call_times: Dict[str, list] = {}
+    call_times: Dict[str, Deque[int]] = defaultdict(deque)
+    window_ns = window_seconds * 1_000_000_000
     
     @middleware
     async def rate_limit_middleware(ctx: Context, next) -> Any:
-        current_time = time.time()
+        current_time = time.monotonic_ns()
         key = f"{ctx.func_name}:{getattr(ctx, 'user_id', 'anonymous')}"
         
-        # Initialize or clean old entries
-        if key not in call_times:
-            call_times[key] = []
-        
-        # Remove old calls outside the window
-        call_times[key] = [t for t in call_times[key] 
-                          if current_time - t < window_seconds]
+        # Drop calls that fell out of the window; timestamps are in order,
+        # so expired ones are always at the left end
+        calls = call_times[key]
+        cutoff = current_time - window_ns
+        while calls and calls[0] <= cutoff:
+            calls.popleft()
         
         # Check rate limit
-        if len(call_times[key]) >= max_calls:
+        if len(calls) >= max_calls:
             raise RuntimeError(f"Rate limit exceeded: {max_calls} calls per {window_seconds}s")
         
         # Record this call
-        call_times[key].append(current_time)
+        calls.append(current_time)
         
         return await next(ctx)
     
@@ -179,8 +186,9 @@ async def risky_operation(value: int) -> Dict[str, Any]:
 @middleware
 async def context_enrichment_middleware(ctx: Context, next) -> Any:
     """Add useful information to the context."""
-    ctx.request_id = f"req_{int(time.time() * 1000)}"
     ctx.start_time = time.time()
+    ctx.request_id = f"req_{int(ctx.start_time * 1000)}"
+    start = time.monotonic_ns()
     
     # Add mock user information
     ctx.user_id = 12345
@@ -189,7 +197,7 @@ async def context_enrichment_middleware(ctx: Context, next) -> Any:
     result = await next(ctx)
     
     # Add response metadata
-    ctx.response_time = time.time() - ctx.start_time
+    ctx.response_time = (time.monotonic_ns() - start) / 1e9
     ctx.success = True
     
     return result
@@ -9,21 +9,31 @@ circuit breaking, and monitoring.
 
 import asyncio
 import aiohttp
+import sys
 import time
-import hashlib
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Hashable, Iterator, List, Mapping, Optional, OrderedDict, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from collections import defaultdict
 from functools import wraps
+from types import MappingProxyType
 import random
 
 from mware import middleware, Context
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; status counts fall back to a dict
+    np = None
+
 
 # Data Classes
-@dataclass
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class ScraperConfig:
     """Configuration for the web scraper."""
     max_retries: int = 3
@@ -32,11 +42,16 @@ class ScraperConfig:
     rate_limit: int = 10  # requests per minute
     circuit_breaker_threshold: int = 5
     circuit_breaker_timeout: int = 60
+    max_concurrency: int = 10  # URLs in flight at once
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ScrapeResult:
-    """Result of a scraping operation."""
+    """Result of a scraping operation.
+    
+    Not meant to be subclassed: middleware checks results with
+    ``type(result) is ScrapeResult``.
+    """
     url: str
     content: str
     status_code: int
@@ -47,42 +62,56 @@ class ScrapeResult:
 
 # Caching Middleware
 class CacheStore:
-    """Simple in-memory cache with TTL support."""
-    def __init__(self, ttl: int = 3600):
+    """In-memory LRU cache with TTL support; expiry is checked lazily on get."""
+    __slots__ = ('ttl', 'ttl_ns', 'maxsize', 'store')
+    
+    def __init__(self, ttl: int = 3600, maxsize: int = 1024):
         self.ttl = ttl
-        self.store: Dict[str, tuple] = {}
+        self.ttl_ns = ttl * 1_000_000_000
+        self.maxsize = maxsize
+        self.store: OrderedDict[Hashable, tuple] = OrderedDict()
     
-    def get(self, key: str) -> Optional[Any]:
-        if key in self.store:
+    def get(self, key: Hashable, now: Optional[int] = None) -> Optional[Any]:
+        try:
             value, timestamp = self.store[key]
-            if time.time() - timestamp < self.ttl:
-                return value
-            del self.store[key]
+        except KeyError:
+            return None
+        if (now or time.monotonic_ns()) - timestamp < self.ttl_ns:
+            self.store.move_to_end(key)
+            return value
+        del self.store[key]
         return None
     
-    def set(self, key: str, value: Any):
-        self.store[key] = (value, time.time())
-    
-    def clear_expired(self):
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, timestamp) in self.store.items()
-            if current_time - timestamp >= self.ttl
-        ]
-        for key in expired_keys:
-            del self.store[key]
+    def set(self, key: Hashable, value: Any):
+        self.store[key] = (value, time.monotonic_ns())
+        self.store.move_to_end(key)
+        if len(self.store) > self.maxsize:
+            self.store.popitem(last=False)
 
 
 cache = CacheStore(ttl=3600)
 
 
+_NO_PARAMS: frozenset = frozenset()
+
+
 @middleware
 async def cache_middleware(ctx: Context, next) -> Any:
     """Cache scraping results to avoid duplicate requests."""
-    cache_key = hashlib.md5(f"{ctx.url}:{ctx.get('params', {})}".encode()).hexdigest()
+    # The dict hashes the tuple itself; most requests carry no params, so
+    # share one empty frozenset rather than building a new one per lookup
+    params = ctx.get('params')
+    if not params:
+        cache_key = (ctx.url, _NO_PARAMS)
+    else:
+        try:
+            cache_key = (ctx.url, frozenset(params.items()))
+        except TypeError:  # unhashable values such as {"ids": [1, 2]}
+            cache_key = (ctx.url, repr(params))
     
     # Check cache
-    cached_result = cache.get(cache_key)
+    # Reuse the request's start time from monitoring_middleware for the TTL check
+    cached_result = cache.get(cache_key, ctx.get('_t0'))
     if cached_result:
         print(f"Cache hit for {ctx.url}")
         cached_result.cached = True
@@ -93,7 +122,7 @@ async def cache_middleware(ctx: Context, next) -> Any:
     result = await next(ctx)
     
     # Cache successful results
-    if isinstance(result, ScrapeResult) and result.status_code == 200:
+    if type(result) is ScrapeResult and result.status_code == 200:
         cache.set(cache_key, result)
     
     return result
@@ -102,15 +131,17 @@ async def cache_middleware(ctx: Context, next) -> Any:
 # Rate Limiting Middleware
 class RateLimiter:
     """Token bucket rate limiter."""
+    __slots__ = ('rate', 'per', 'allowance', 'last_check')
+    
     def __init__(self, rate: int, per: int = 60):
         self.rate = rate
         self.per = per
         self.allowance = rate
-        self.last_check = time.time()
+        self.last_check = time.monotonic_ns()
     
     async def acquire(self):
-        current = time.time()
-        time_passed = current - self.last_check
+        current = time.monotonic_ns()
+        time_passed = (current - self.last_check) / 1e9
         self.last_check = current
         
         # Replenish tokens
@@ -146,7 +177,7 @@ async def retry_middleware(ctx: Context, next) -> Any:
     for attempt in range(max_retries + 1):
         try:
             result = await next(ctx)
-            if isinstance(result, ScrapeResult) and result.status_code >= 500:
+            if type(result) is ScrapeResult and result.status_code >= 500:
                 # Retry on server errors
                 if attempt < max_retries:
                     delay = retry_delay * (2 ** attempt) + random.uniform(0, 1)
@@ -171,6 +202,8 @@ async def retry_middleware(ctx: Context, next) -> Any:
 # Circuit Breaker Middleware
 class CircuitBreaker:
     """Circuit breaker to prevent cascading failures."""
+    __slots__ = ('failure_threshold', 'timeout', 'failures', 'last_failure_time', 'state')
+    
     def __init__(self, failure_threshold: int = 5, timeout: int = 60):
         self.failure_threshold = failure_threshold
         self.timeout = timeout
@@ -184,7 +217,7 @@ class CircuitBreaker:
     
     def record_failure(self):
         self.failures += 1
-        self.last_failure_time = time.time()
+        self.last_failure_time = time.monotonic()
         
         if self.failures >= self.failure_threshold:
             self.state = "open"
@@ -195,7 +228,7 @@ class CircuitBreaker:
             return True
         
         if self.state == "open":
-            if time.time() - self.last_failure_time > self.timeout:
+            if time.monotonic() - self.last_failure_time > self.timeout:
                 self.state = "half-open"
                 print("Circuit breaker entering half-open state")
                 return True
@@ -224,15 +257,23 @@ async def circuit_breaker_middleware(ctx: Context, next) -> Any:
 # Monitoring Middleware
 class ScrapeMetrics:
     """Collect metrics about scraping operations."""
-    def __init__(self):
+    __slots__ = ('total_requests', 'successful_requests', 'failed_requests', 'cache_hits',
+                 'total_time', 'status_codes', 'count_statuses', '_dirty', '_cached_summary')
+    
+    def __init__(self, count_statuses: bool = True):
         self.total_requests = 0
         self.successful_requests = 0
         self.failed_requests = 0
         self.cache_hits = 0
         self.total_time = 0.0
-        self.status_codes = defaultdict(int)
+        self.status_codes: Dict[int, int] = defaultdict(int)
+        # Batches turn this off and merge their statuses with add_status_codes
+        self.count_statuses = count_statuses
+        self._dirty = True
+        self._cached_summary: Dict[str, Any] = {}
     
     def record_request(self, result: ScrapeResult, duration: float):
+        self._dirty = True
         self.total_requests += 1
         self.total_time += duration
         
@@ -244,96 +285,153 @@ class ScrapeMetrics:
         else:
             self.failed_requests += 1
         
-        self.status_codes[result.status_code] += 1
+        if self.count_statuses:
+            self.status_codes[result.status_code] += 1
+    
+    def add_status_codes(self, codes: List[int]) -> None:
+        """Merge a finished batch's status codes into ``status_codes``."""
+        self._dirty = True
+        if np is not None and codes:
+            # One vectorized histogram instead of a Python increment per result
+            counts = np.bincount(np.fromiter(codes, dtype=np.int32, count=len(codes)))
+            present = np.flatnonzero(counts)
+            for code, count in zip(present.tolist(), counts[present].tolist()):
+                self.status_codes[code] += count
+        else:
+            for code in codes:
+                self.status_codes[code] += 1
     
     def get_summary(self) -> Dict[str, Any]:
-        return {
-            "total_requests": self.total_requests,
-            "successful_requests": self.successful_requests,
-            "failed_requests": self.failed_requests,
-            "cache_hit_rate": self.cache_hits / self.total_requests if self.total_requests > 0 else 0,
-            "avg_response_time": self.total_time / self.total_requests if self.total_requests > 0 else 0,
-            "status_codes": dict(self.status_codes)
-        }
+        """Return the summary, rebuilt only after new requests were recorded.
+        
+        The returned dict is shared between calls; treat it as read-only.
+        """
+        if self._dirty:
+            self._cached_summary = {
+                "total_requests": self.total_requests,
+                "successful_requests": self.successful_requests,
+                "failed_requests": self.failed_requests,
+                "cache_hit_rate": self.cache_hits / self.total_requests if self.total_requests > 0 else 0,
+                "avg_response_time": self.total_time / self.total_requests if self.total_requests > 0 else 0,
+                "status_codes": dict(self.status_codes)
+            }
+            self._dirty = False
+        return self._cached_summary
 
 
 @middleware
 async def monitoring_middleware(ctx: Context, next) -> Any:
-    """Monitor scraping operations and collect metrics."""
+    """Monitor scraping operations and collect metrics.
+    
+    Records the request start as ``ctx._t0`` (monotonic ns) so inner layers
+    that only need an approximate "now" can reuse it instead of reading the
+    clock again.
+    """
     metrics = ctx.get('metrics') or ScrapeMetrics()
-    start_time = time.time()
+    start_time = ctx._t0 = time.monotonic_ns()
     
     try:
         result = await next(ctx)
-        duration = time.time() - start_time
+        duration = (time.monotonic_ns() - start_time) / 1e9
         
-        if isinstance(result, ScrapeResult):
+        if type(result) is ScrapeResult:
             metrics.record_request(result, duration)
             print(f"Scraped {ctx.url} in {duration:.3f}s (status: {result.status_code})")
         
         return result
     except Exception as e:
-        duration = time.time() - start_time
+        duration = (time.monotonic_ns() - start_time) / 1e9
         print(f"Failed to scrape {ctx.url} after {duration:.3f}s: {e}")
         raise
 
 
 # Header Management Middleware
+# Shared by every request without header overrides, so read-only
+DEFAULT_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Mware Scraper) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+})
+
+
 @middleware
 async def headers_middleware(ctx: Context, next) -> Any:
     """Add common headers to requests."""
-    default_headers = {
-        'User-Agent': 'Mozilla/5.0 (Mware Scraper) AppleWebKit/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
-    
-    ctx.headers = {**default_headers, **ctx.get('headers', {})}
+    overrides = ctx.get('headers')
+    if not overrides or overrides is DEFAULT_HEADERS:
+        ctx.headers = DEFAULT_HEADERS
+    else:
+        # Only allocate a merged dict when there is something to merge
+        ctx.headers = {**DEFAULT_HEADERS, **overrides}
     return await next(ctx)
 
 
-# The actual scraper function
+async def _fetch(session: aiohttp.ClientSession, url: str,
+                 headers: Mapping[str, str], timeout: float) -> ScrapeResult:
+    """Fetch a single URL; no middleware, no shared state."""
+    try:
+        async with session.get(url, headers=headers, timeout=timeout) as response:
+            content = await response.text()
+            return ScrapeResult(
+                url=url,
+                content=content,
+                status_code=response.status,
+                headers=dict(response.headers),
+                scraped_at=datetime.now(),
+                cached=False
+            )
+    except aiohttp.ClientError as e:
+        # Return error result
+        return ScrapeResult(
+            url=url,
+            content=str(e),
+            status_code=0,
+            headers={},
+            scraped_at=datetime.now(),
+            cached=False
+        )
+
+
+# The actual scraper function. The cache sits outside the circuit breaker,
+# retries and rate limiter so a hit returns without spending a rate-limit
+# token; monitoring stays outermost so hits are still counted.
 @monitoring_middleware
+@cache_middleware
 @circuit_breaker_middleware
 @retry_middleware
 @rate_limit_middleware
-@cache_middleware
 @headers_middleware
 async def scrape_url(ctx: Context) -> ScrapeResult:
     """Scrape a URL with all middleware protections."""
-    url = ctx.url
-    headers = ctx.headers
-    timeout = ctx.get('timeout', 30)
+    # The session is shared across the batch, see scrape_urls
+    return await _fetch(ctx.session, ctx.url, ctx.headers, ctx.get('timeout', 30))
+
+
+# Batch scraping with concurrent execution
+async def _scrape_worker(base: Context, jobs: Iterator[Tuple[int, str]],
+                         results: List[Any]):
+    """Scrape URLs from a shared job iterator, reusing a single Context.
     
-    async with aiohttp.ClientSession() as session:
+    The context is reset to the batch's base attributes before each URL, so
+    a batch allocates one Context per worker rather than one per URL.
+    """
+    base_data = dict(base.__dict__)
+    ctx = base.copy()
+    for index, url in jobs:
+        data = ctx.__dict__
+        data.clear()
+        data.update(base_data)
+        ctx.url = url
         try:
-            async with session.get(url, headers=headers, timeout=timeout) as response:
-                content = await response.text()
-                return ScrapeResult(
-                    url=url,
-                    content=content,
-                    status_code=response.status,
-                    headers=dict(response.headers),
-                    scraped_at=datetime.now(),
-                    cached=False
-                )
-        except aiohttp.ClientError as e:
-            # Return error result
-            return ScrapeResult(
-                url=url,
-                content=str(e),
-                status_code=0,
-                headers={},
-                scraped_at=datetime.now(),
-                cached=False
-            )
+            results[index] = await scrape_url(ctx)
+        except Exception as e:
+            results[index] = e
 
 
-# Batch scraping with concurrent execution
 async def scrape_urls(urls: List[str], config: ScraperConfig = None) -> List[ScrapeResult]:
     """Scrape multiple URLs concurrently."""
     config = config or ScraperConfig()
@@ -341,30 +439,38 @@ async def scrape_urls(urls: List[str], config: ScraperConfig = None) -> List[Scr
     # Create shared context
     ctx = Context()
     ctx.config = config
-    ctx.metrics = ScrapeMetrics()
+    # Status codes are counted in one pass once the batch is done
+    ctx.metrics = ScrapeMetrics(count_statuses=False)
     ctx.rate_limiter = RateLimiter(config.rate_limit, 60)
     ctx.circuit_breaker = CircuitBreaker(
         config.circuit_breaker_threshold,
         config.circuit_breaker_timeout
     )
     
-    # Create tasks for all URLs
-    tasks = []
-    for url in urls:
-        url_ctx = Context()
-        url_ctx.update(ctx.__dict__)
-        url_ctx.url = url
-        tasks.append(scrape_url(url_ctx))
+    # One session for the whole batch so connections, DNS lookups and TLS
+    # sessions are pooled instead of being set up again for every URL
+    ctx.session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+    )
     
-    # Execute concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        # A fixed set of workers drains the URL list; results keep input order
+        results: List[Any] = [None] * len(urls)
+        jobs = iter(enumerate(urls))
+        workers = min(config.max_concurrency, len(urls))
+        await asyncio.gather(*(_scrape_worker(ctx, jobs, results) for _ in range(workers)))
+    finally:
+        await ctx.session.close()
+    
+    # Filter out exceptions
+    scraped = [r for r in results if isinstance(r, ScrapeResult)]
+    ctx.metrics.add_status_codes([r.status_code for r in scraped])
     
     # Print metrics summary
     print("\nScraping Summary:")
     print(json.dumps(ctx.metrics.get_summary(), indent=2))
     
-    # Filter out exceptions
-    return [r for r in results if isinstance(r, ScrapeResult)]
+    return scraped
 
 
 # Example usage
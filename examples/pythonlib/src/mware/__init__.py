@@ -2,9 +2,9 @@
 Mware - A Python middleware decorators library with exceptional developer experience.
 """
 
-from .core import middleware
+from .core import compile_chain, middleware, use_uvloop
 from .context import Context
 from .decorators import timing_middleware
 
 __version__ = "0.1.0"
-__all__ = ["middleware", "Context", "timing_middleware"]
\ No newline at end of file
+__all__ = ["middleware", "compile_chain", "use_uvloop", "Context", "timing_middleware"]
\ No newline at end of file
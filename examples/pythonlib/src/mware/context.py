@@ -2,7 +2,9 @@
 Context object that flows through the middleware chain.
 """
 
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Mapping, Optional
+
+from .errors import ContextError
 
 
 class Context:
@@ -13,80 +15,110 @@ class Context:
     while maintaining type safety and clean interfaces.
     """
     
+    # Public attributes live directly in the instance __dict__, so reads and
+    # writes use the interpreter's native attribute lookup. Internal state
+    # sits in slots or underscore-prefixed names and is hidden from the
+    # mapping-style API below. Method names are rejected as attribute names
+    # by __init__, set, update and fork; plain assignment is not checked, so
+    # the methods below read self.__dict__ rather than calling each other.
+    __slots__ = ('_metadata', '__dict__', '__weakref__')
+    
+    if TYPE_CHECKING:
+        # Middleware set and read arbitrary attributes; tell type checkers so
+        def __getattr__(self, name: str) -> Any: ...
+        
+        def __setattr__(self, name: str, value: Any) -> None: ...
+    
     def __init__(self, **kwargs: Any) -> None:
         """Initialize context with optional keyword arguments."""
-        self._data: Dict[str, Any] = {}
         self._metadata: Dict[str, Any] = {}
-        
-        # Set initial data from kwargs
-        for key, value in kwargs.items():
-            setattr(self, key, value)
-    
-    def __getattr__(self, name: str) -> Any:
-        """Get attribute from context data."""
-        if name.startswith('_'):
-            raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
-        
-        if name in self._data:
-            return self._data[name]
-        
-        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
-    
-    def __setattr__(self, name: str, value: Any) -> None:
-        """Set attribute in context data."""
-        if name.startswith('_'):
-            # Internal attributes go directly to the instance
-            super().__setattr__(name, value)
-        else:
-            # Public attributes go to the data dictionary
-            if '_data' not in self.__dict__:
-                super().__setattr__('_data', {})
-            self._data[name] = value
+        if kwargs:
+            _check_names(kwargs)
+            self.__dict__.update(kwargs)
     
     def __contains__(self, name: str) -> bool:
         """Check if attribute exists in context."""
-        return name in self._data
+        return not name.startswith('_') and name in self.__dict__
     
     def get(self, name: str, default: Any = None) -> Any:
         """Get attribute with optional default value."""
-        return self._data.get(name, default)
+        return self.__dict__.get(name, default)
     
     def set(self, name: str, value: Any) -> None:
         """Set attribute value."""
-        self._data[name] = value
+        if name in _RESERVED:
+            _check_names((name,))
+        self.__dict__[name] = value
     
-    def update(self, **kwargs: Any) -> None:
-        """Update multiple attributes at once."""
-        self._data.update(kwargs)
+    def update(self, other: Optional[Mapping[str, Any]] = None, /, **kwargs: Any) -> None:
+        """Update multiple attributes at once, from a mapping and/or keywords.
+        
+        Passing a mapping sets its items with a single dict update instead of
+        unpacking it into keyword arguments first.
+        """
+        data = self.__dict__
+        if other:
+            _check_names(other)
+            data.update(other)
+        if kwargs:
+            _check_names(kwargs)
+            data.update(kwargs)
     
     def clear(self) -> None:
         """Clear all context data."""
-        self._data.clear()
+        data = self.__dict__
+        for key in [k for k in data if not k.startswith('_')]:
+            del data[key]
     
     def keys(self) -> list:
         """Get all attribute names."""
-        return list(self._data.keys())
+        return [k for k in self.__dict__ if not k.startswith('_')]
     
     def values(self) -> list:
         """Get all attribute values."""
-        return list(self._data.values())
+        return [v for k, v in self.__dict__.items() if not k.startswith('_')]
     
     def items(self) -> list:
         """Get all attribute name-value pairs."""
-        return list(self._data.items())
+        return [(k, v) for k, v in self.__dict__.items() if not k.startswith('_')]
     
     def copy(self) -> 'Context':
         """Create a shallow copy of the context."""
-        new_context = Context()
-        new_context._data = self._data.copy()
+        new_context = Context.__new__(Context)
+        new_context.__dict__.update(self.__dict__)
         new_context._metadata = self._metadata.copy()
         return new_context
     
+    def fork(self, **overrides: Any) -> 'Context':
+        """Create a shallow copy of the context with some attributes replaced."""
+        new_context = Context.copy(self)
+        if overrides:
+            _check_names(overrides)
+            new_context.__dict__.update(overrides)
+        return new_context
+    
     def __repr__(self) -> str:
         """String representation of the context."""
-        return f"Context({self._data})"
+        data = {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+        return f"Context({data})"
     
     def __str__(self) -> str:
         """Human-readable string representation."""
-        items = ', '.join(f'{k}={v!r}' for k, v in self._data.items())
+        items = ', '.join(
+            f'{k}={v!r}' for k, v in self.__dict__.items() if not k.startswith('_')
+        )
         return f"Context({items})"
+
+
+# Context's own method names; storing data under them would hide the method
+_RESERVED = frozenset(name for name in vars(Context) if not name.startswith('_'))
+
+
+def _check_names(names: Iterable[str]) -> None:
+    """Raise ContextError if any of ``names`` is a Context method name."""
+    if not _RESERVED.isdisjoint(names):
+        name = min(_RESERVED.intersection(names))
+        raise ContextError(
+            f"'{name}' is a Context method and cannot be used as an attribute name",
+            key=name,
+        )
@@ -4,12 +4,85 @@ Core middleware implementation with async-first design.
 
 import asyncio
 import functools
-from typing import Any, Callable, TypeVar, Union
+import inspect
+import weakref
+from typing import Any, Callable, Tuple, TypeVar, Union
 
 from .context import Context
 from .types import AsyncMiddleware, Middleware, Next
 
 T = TypeVar("T")
+_Fn = Callable[..., Any]
+
+# Async middleware wrappers -> (middleware stack outermost-first, inner handler).
+# Keyed by wrapper identity rather than a function attribute, because
+# functools.wraps copies attributes onto unrelated wrapping decorators.
+_CHAINS: "weakref.WeakKeyDictionary[_Fn, Tuple[Tuple[_Fn, ...], _Fn]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Sync wrappers (sync middleware around an async handler) that hand back a
+# coroutine when called inside a running loop. asyncio.iscoroutinefunction
+# reports them as sync, so outer middleware must await their result if needed.
+_MAY_AWAIT: "weakref.WeakSet[_Fn]" = weakref.WeakSet()
+
+
+def _may_await(handler: _Fn) -> bool:
+    """Whether ``handler`` is a sync wrapper that can return an awaitable."""
+    try:
+        return handler in _MAY_AWAIT
+    except TypeError:  # not weak-referenceable
+        return False
+
+
+def _bind(mw: _Fn, next_fn: _Fn) -> Callable[[Context], Any]:
+    """Return the ``next`` callable that runs ``mw`` in front of ``next_fn``."""
+    return lambda context: mw(context, next_fn)
+
+
+def _chain_wrapper(chain: Tuple[_Fn, ...], handler: _Fn, wrapped: _Fn) -> _Fn:
+    """
+    Run a stack of async middleware around ``handler`` from a single wrapper.
+    
+    Equivalent to nesting one wrapper per middleware, but each call splits the
+    context once and each layer costs one small ``next`` closure instead of a
+    wrapper coroutine plus an inner ``next_fn`` coroutine.
+    """
+    is_async_handler = asyncio.iscoroutinefunction(handler)
+    may_await = _may_await(handler)
+    outer = chain[0]
+    inner_first = chain[:0:-1]
+    
+    @functools.wraps(wrapped)
+    async def chain_wrapper(*args: Any, **kwargs: Any) -> Any:
+        if args and (type(args[0]) is Context or isinstance(args[0], Context)):
+            ctx = args[0]
+            args = args[1:]
+        else:
+            ctx = Context()
+        
+        next_fn: Callable[[Context], Any]
+        if is_async_handler:
+            if args or kwargs:
+                def call_handler(context: Context) -> Any:
+                    return handler(context, *args, **kwargs)
+                next_fn = call_handler
+            else:
+                next_fn = handler
+        else:
+            async def call_sync_handler(context: Context) -> Any:
+                result = handler(context, *args, **kwargs)
+                if may_await and inspect.isawaitable(result):
+                    result = await result
+                return result
+            next_fn = call_sync_handler
+        
+        for mw in inner_first:
+            next_fn = _bind(mw, next_fn)
+        return await outer(ctx, next_fn)
+    
+    _CHAINS[chain_wrapper] = (chain, handler)
+    return chain_wrapper
 
 
 def middleware(func: Union[Middleware, AsyncMiddleware]) -> Callable:
@@ -23,80 +96,150 @@ def middleware(func: Union[Middleware, AsyncMiddleware]) -> Callable:
     def decorator(handler: Callable) -> Callable:
         is_async_handler = asyncio.iscoroutinefunction(handler)
         
-        @functools.wraps(handler)
-        def wrapper(*args, **kwargs) -> Any:
-            # Extract context
-            if args and isinstance(args[0], Context):
-                ctx = args[0]
-                new_args = args[1:]
-            else:
-                ctx = Context()
-                new_args = args
-            
-            # Case 1: Sync middleware with sync handler
-            if not is_async_middleware and not is_async_handler:
+        # Stacking onto another async middleware wrapper: fold both into one
+        # flat chain instead of adding another wrapper layer
+        if is_async_middleware:
+            try:
+                stacked = _CHAINS.get(handler)
+            except TypeError:  # handler is not weak-referenceable
+                stacked = None
+            if stacked is not None:
+                chain, inner = stacked
+                return _chain_wrapper((func,) + chain, inner, handler)
+        
+        # The middleware/handler combination is fixed once decorated, so build
+        # exactly one specialized wrapper instead of dispatching on every call.
+        # Exact-type check first; isinstance keeps Context subclasses working.
+        
+        # Case 1: Sync middleware with sync handler
+        if not is_async_middleware and not is_async_handler:
+            @functools.wraps(handler)
+            def sync_sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if args and (type(args[0]) is Context or isinstance(args[0], Context)):
+                    ctx = args[0]
+                    args = args[1:]
+                else:
+                    ctx = Context()
+                
+                if not args and not kwargs:
+                    # Nothing to bind: the handler already is ``next``
+                    return func(ctx, handler)
+                
                 def next_fn(context: Context) -> Any:
-                    return handler(context, *new_args, **kwargs)
+                    return handler(context, *args, **kwargs)
                 
                 return func(ctx, next_fn)
             
-            # Case 2: Sync middleware with async handler 
-            # This needs to run the async handler in an event loop
-            elif not is_async_middleware and is_async_handler:
+            # Over a sync wrapper that may hand back a coroutine, this wrapper
+            # may too, so outer async middleware still know to await it
+            if _may_await(handler):
+                _MAY_AWAIT.add(sync_sync_wrapper)
+            return sync_sync_wrapper
+        
+        # Case 2: Sync middleware with async handler
+        # This needs to run the async handler in an event loop
+        if not is_async_middleware:
+            @functools.wraps(handler)
+            def sync_async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if args and (type(args[0]) is Context or isinstance(args[0], Context)):
+                    ctx = args[0]
+                    args = args[1:]
+                else:
+                    ctx = Context()
+                
                 def next_fn(context: Context) -> Any:
-                    # Run the async handler synchronously
-                    return asyncio.run(handler(context, *new_args, **kwargs))
+                    coro = handler(context, *args, **kwargs)
+                    try:
+                        asyncio.get_running_loop()
+                    except RuntimeError:
+                        # No loop yet: run the async handler synchronously
+                        return asyncio.run(coro)
+                    # Already inside a loop: hand the coroutine back to await
+                    return coro
                 
                 return func(ctx, next_fn)
             
-            # Cases with async middleware need async handling
-            else:
-                return asyncio.run(async_wrapper(*args, **kwargs))
+            _MAY_AWAIT.add(sync_async_wrapper)
+            return sync_async_wrapper
+        
+        # Case 3: Async middleware with async handler
+        if is_async_handler:
+            @functools.wraps(handler)
+            async def async_async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if args and (type(args[0]) is Context or isinstance(args[0], Context)):
+                    ctx = args[0]
+                    args = args[1:]
+                else:
+                    ctx = Context()
+                
+                if not args and not kwargs:
+                    return await func(ctx, handler)
+                
+                # Plain function returning the handler's coroutine: the
+                # middleware awaits it, so no extra coroutine frame is needed
+                def next_fn(context: Context) -> Any:
+                    return handler(context, *args, **kwargs)
+                
+                return await func(ctx, next_fn)
+            
+            _CHAINS[async_async_wrapper] = ((func,), handler)
+            return async_async_wrapper
+        
+        # Case 4: Async middleware with sync handler
+        may_await = _may_await(handler)
         
         @functools.wraps(handler)
-        async def async_wrapper(*args, **kwargs) -> Any:
-            # Extract context
-            if args and isinstance(args[0], Context):
+        async def async_sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if args and (type(args[0]) is Context or isinstance(args[0], Context)):
                 ctx = args[0]
-                new_args = args[1:]
+                args = args[1:]
             else:
                 ctx = Context()
-                new_args = args
             
-            # Case 3: Async middleware with async handler
-            if is_async_middleware and is_async_handler:
-                async def next_fn(context: Context) -> Any:
-                    return await handler(context, *new_args, **kwargs)
-                
-                return await func(ctx, next_fn)
+            async def next_fn(context: Context) -> Any:
+                # Run sync handler directly - no need for executor for simple sync functions
+                result = handler(context, *args, **kwargs)
+                if may_await and inspect.isawaitable(result):
+                    result = await result
+                return result
             
-            # Case 4: Async middleware with sync handler
-            elif is_async_middleware and not is_async_handler:
-                async def next_fn(context: Context) -> Any:
-                    # Run sync handler directly - no need for executor for simple sync functions
-                    return handler(context, *new_args, **kwargs)
-                
-                return await func(ctx, next_fn)
-            
-            # This shouldn't happen, but handle it
-            else:
-                raise RuntimeError("Unexpected middleware/handler combination")
+            return await func(ctx, next_fn)
         
-        # Choose wrapper based on what we need  
-        # The key insight: if handler is async, ALWAYS need an async-capable wrapper
-        # even with sync middleware
-        if is_async_handler:
-            # For async handlers, we need special handling
-            if is_async_middleware:
-                return async_wrapper
-            else:
-                # Sync middleware + async handler = needs special wrapper
-                return wrapper
-        else:
-            # For sync handlers, return based on middleware type
-            if is_async_middleware:
-                return async_wrapper
-            else:
-                return wrapper
+        _CHAINS[async_sync_wrapper] = ((func,), handler)
+        return async_sync_wrapper
+    
+    return decorator
+
+
+def compile_chain(*middlewares: Union[Middleware, AsyncMiddleware], handler: _Fn) -> _Fn:
+    """
+    Wrap ``handler`` in ``middlewares`` (outermost first) in one step.
     
-    return decorator
\ No newline at end of file
+    Equivalent to stacking ``@middleware`` decorators in the same order.
+    Consecutive async middleware are fused into a single flat chain, so a
+    call costs one wrapper instead of one wrapper per layer.
+    """
+    if not middlewares:
+        raise ValueError("compile_chain() needs at least one middleware")
+    
+    wrapped = handler
+    for func in reversed(middlewares):
+        wrapped = middleware(func)(wrapped)
+    return wrapped
+
+
+def use_uvloop() -> bool:
+    """
+    Run new event loops on uvloop when it is installed.
+    
+    Call before ``asyncio.run``. Middleware chains spend most of their
+    overhead in loop scheduling, which uvloop implements in C. Returns
+    whether uvloop was installed; without it (e.g. on Windows) the default
+    loop is left in place.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
@@ -4,7 +4,7 @@ Built-in middleware decorators for common use cases.
 
 import time
 import asyncio
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Optional
 
 from .core import middleware
 from .context import Context
@@ -16,15 +16,17 @@ async def timing_middleware(ctx: Context, next: Next) -> Any:
     """
     Middleware that measures execution time of the wrapped handler.
     
-    Adds the execution time to the context as 'timing' attribute.
+    Adds the execution time to the context as 'timing' attribute, in
+    seconds, and as 'timing_ns', an exact int number of nanoseconds.
     """
-    start = time.perf_counter()
+    start = time.perf_counter_ns()
     try:
         result = await next(ctx)
         return result
     finally:
-        elapsed = time.perf_counter() - start
-        ctx.timing = elapsed
+        elapsed = time.perf_counter_ns() - start
+        ctx.timing_ns = elapsed
+        ctx.timing = elapsed / 1e9
 
 
 @middleware
@@ -48,23 +50,24 @@ async def retry_middleware(ctx: Context, next: Next) -> Any:
     Middleware that retries the handler on failure.
     
     Uses 'max_retries' from context (default: 3) and 'retry_delay' (default: 0.1).
+    A 'retry_delay' of 0 or less retries immediately, without creating a
+    timer or future between attempts.
     """
-    max_retries = ctx.get('max_retries', 3)
-    retry_delay = ctx.get('retry_delay', 0.1)
+    # Read settings straight from the attribute dict, skipping Context.get
+    data = ctx.__dict__
+    max_retries = data.get('max_retries', 3)
+    retry_delay = data.get('retry_delay', 0.1)
     
-    last_error = None
-    for attempt in range(max_retries):
+    attempt = 1
+    while True:
         try:
             return await next(ctx)
-        except Exception as e:
-            last_error = e
-            if attempt < max_retries - 1:
-                await asyncio.sleep(retry_delay)
-                continue
-            raise
-    
-    # This should never be reached, but for type safety
-    raise last_error  # type: ignore
+        except Exception:
+            if attempt >= max_retries:
+                raise
+            attempt += 1
+        if retry_delay > 0:
+            await asyncio.sleep(retry_delay)
 
 
 @middleware
@@ -72,29 +75,58 @@ async def logging_middleware(ctx: Context, next: Next) -> Any:
     """
     Middleware that logs handler execution.
     
-    Uses 'logger' from context if available, otherwise uses print.
+    Uses 'logger' from context if available, otherwise uses print. Set
+    'log_level' to 'error' in the context to log failures only.
     """
-    logger = ctx.get('logger')
-    handler_name = ctx.get('handler_name', 'unknown')
+    data = ctx.__dict__
+    logger = data.get('logger')
+    handler_name = data.get('handler_name', 'unknown')
+    log_success = data.get('log_level', 'info') != 'error'
+    info = logger.info if logger else print
     
-    if logger:
-        logger.info(f"Starting handler: {handler_name}")
-    else:
-        print(f"Starting handler: {handler_name}")
+    if log_success:
+        info(f"Starting handler: {handler_name}")
     
     try:
         result = await next(ctx)
-        if logger:
-            logger.info(f"Handler {handler_name} completed successfully")
-        else:
-            print(f"Handler {handler_name} completed successfully")
-        return result
     except Exception as e:
-        if logger:
-            logger.error(f"Handler {handler_name} failed: {str(e)}")
-        else:
-            print(f"Handler {handler_name} failed: {str(e)}")
+        error = logger.error if logger else print
+        error(f"Handler {handler_name} failed: {e}")
         raise
+    
+    if log_success:
+        info(f"Handler {handler_name} completed successfully")
+    return result
+
+
+def _make_async_with_ctx(func: Callable[..., Any], attrs: Dict[str, Any]) -> Callable[..., Any]:
+    """Build the async ``with_context`` wrapper for ``func``."""
+    async def async_wrapper(*args: Any, **kw: Any) -> Any:
+        if args and (type(args[0]) is Context or isinstance(args[0], Context)):
+            # Unbound call: a user attribute named 'update' must not shadow it
+            Context.update(args[0], attrs)
+        else:
+            # Create new context with the provided attributes
+            ctx = Context()
+            ctx.update(attrs)
+            args = (ctx,) + args
+        return await func(*args, **kw)
+    return async_wrapper
+
+
+def _make_sync_with_ctx(func: Callable[..., Any], attrs: Dict[str, Any]) -> Callable[..., Any]:
+    """Build the sync ``with_context`` wrapper for ``func``."""
+    def sync_wrapper(*args: Any, **kw: Any) -> Any:
+        if args and (type(args[0]) is Context or isinstance(args[0], Context)):
+            # Unbound call: a user attribute named 'update' must not shadow it
+            Context.update(args[0], attrs)
+        else:
+            # Create new context with the provided attributes
+            ctx = Context()
+            ctx.update(attrs)
+            args = (ctx,) + args
+        return func(*args, **kw)
+    return sync_wrapper
 
 
 def with_context(**kwargs: Any) -> Callable:
@@ -108,27 +140,12 @@ def with_context(**kwargs: Any) -> Callable:
             # ctx.user_id and ctx.request_id are available
             pass
     """
+    # Private copy taken once; each call hands the dict to Context.update
+    # as a mapping instead of re-unpacking keyword arguments
+    attrs = dict(kwargs)
+    
     def decorator(func: Callable) -> Callable:
         if asyncio.iscoroutinefunction(func):
-            async def async_wrapper(*args: Any, **kw: Any) -> Any:
-                if args and isinstance(args[0], Context):
-                    ctx = args[0]
-                    ctx.update(**kwargs)
-                else:
-                    # Create new context with the provided kwargs
-                    ctx = Context(**kwargs)
-                    args = (ctx,) + args
-                return await func(*args, **kw)
-            return async_wrapper
-        else:
-            def sync_wrapper(*args: Any, **kw: Any) -> Any:
-                if args and isinstance(args[0], Context):
-                    ctx = args[0]
-                    ctx.update(**kwargs)
-                else:
-                    # Create new context with the provided kwargs
-                    ctx = Context(**kwargs)
-                    args = (ctx,) + args
-                return func(*args, **kw)
-            return sync_wrapper
+            return _make_async_with_ctx(func, attrs)
+        return _make_sync_with_ctx(func, attrs)
     return decorator
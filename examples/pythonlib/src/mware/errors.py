@@ -5,34 +5,55 @@ This module provides sophisticated error classes and utilities that enhance
 the debugging experience for middleware users.
 """
 
+import asyncio
+import contextvars
+import functools
 import sys
 import traceback
-from typing import Any, Callable, Dict, List, Optional, Type, Union
+from collections import deque
+from typing import Any, Callable, Counter, Deque, Dict, List, Optional, Type, Union
 
 
 class MiddlewareError(Exception):
     """Base exception for all middleware-related errors with enhanced debugging info."""
     
+    # Slots keep BaseException from allocating an instance __dict__; the
+    # containers stay None until something is added, since most errors are
+    # raised without suggestions, related errors or debug info
+    __slots__ = ("message", "metadata", "_suggestions", "_related_errors", "_debug_info")
+    
     def __init__(self, message: str, **metadata: Any) -> None:
         super().__init__(message)
         self.message = message
         self.metadata = metadata
-        self._suggestions: List[str] = []
-        self._related_errors: List[Exception] = []
-        self._debug_info: Dict[str, Any] = {}
+        self._suggestions: Optional[List[str]] = None
+        self._related_errors: Optional[List[Exception]] = None
+        self._debug_info: Optional[Dict[str, Any]] = None
+        
+    def __reduce__(self) -> Any:
+        """Pickle slot values too; BaseException only saves the instance __dict__."""
+        state = {name: getattr(self, name) for name in MiddlewareError.__slots__}
+        state.update(self.__dict__)
+        return (type(self), self.args, state)
         
     def add_suggestion(self, suggestion: str) -> "MiddlewareError":
         """Add a helpful suggestion for fixing this error."""
+        if self._suggestions is None:
+            self._suggestions = []
         self._suggestions.append(suggestion)
         return self
         
     def add_related_error(self, error: Exception) -> "MiddlewareError":
         """Add a related error that might have caused this one."""
+        if self._related_errors is None:
+            self._related_errors = []
         self._related_errors.append(error)
         return self
         
     def add_debug_info(self, key: str, value: Any) -> "MiddlewareError":
         """Add debugging information."""
+        if self._debug_info is None:
+            self._debug_info = {}
         self._debug_info[key] = value
         return self
         
@@ -40,25 +61,22 @@ class MiddlewareError(Exception):
         """Generate a rich, formatted error message."""
         parts = [f"MiddlewareError: {self.message}"]
         
+        # One extend per section instead of an append call per line
         if self.metadata:
             parts.append("\nError Context:")
-            for key, value in self.metadata.items():
-                parts.append(f"  {key}: {value}")
+            parts.extend([f"  {key}: {value}" for key, value in self.metadata.items()])
         
         if self._debug_info:
             parts.append("\nDebug Information:")
-            for key, value in self._debug_info.items():
-                parts.append(f"  {key}: {value}")
+            parts.extend([f"  {key}: {value}" for key, value in self._debug_info.items()])
         
         if self._suggestions:
             parts.append("\nDid you mean?")
-            for suggestion in self._suggestions:
-                parts.append(f"  → {suggestion}")
+            parts.extend([f"  → {suggestion}" for suggestion in self._suggestions])
         
         if self._related_errors:
             parts.append("\nRelated Errors:")
-            for error in self._related_errors:
-                parts.append(f"  - {type(error).__name__}: {error}")
+            parts.extend([f"  - {type(error).__name__}: {error}" for error in self._related_errors])
         
         return "\n".join(parts)
 
@@ -66,6 +84,8 @@ class MiddlewareError(Exception):
 class ConfigurationError(MiddlewareError):
     """Raised when middleware is incorrectly configured."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str, field: Optional[str] = None, **metadata: Any) -> None:
         super().__init__(message, field=field, **metadata)
         if field:
@@ -75,6 +95,8 @@ class ConfigurationError(MiddlewareError):
 class ChainError(MiddlewareError):
     """Raised when there's an error in the middleware chain execution."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str, position: Optional[int] = None, **metadata: Any) -> None:
         super().__init__(message, position=position, **metadata)
         if position is not None:
@@ -84,6 +106,8 @@ class ChainError(MiddlewareError):
 class ContextError(MiddlewareError):
     """Raised when there's an error with the context object."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str, key: Optional[str] = None, **metadata: Any) -> None:
         super().__init__(message, key=key, **metadata)
         if key:
@@ -93,6 +117,8 @@ class ContextError(MiddlewareError):
 class ValidationError(MiddlewareError):
     """Raised when input validation fails."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str, field: Optional[str] = None, 
                  value: Any = None, **metadata: Any) -> None:
         super().__init__(message, field=field, value=value, **metadata)
@@ -102,6 +128,22 @@ class ValidationError(MiddlewareError):
             self.add_debug_info("invalid_value", value)
 
 
+class _FormattedTrace:
+    """A trace cached on its exception by ``format_middleware_trace``."""
+    
+    __slots__ = ("tb", "debug", "message", "text")
+    
+    def __init__(self, tb: Any, debug: bool, message: str, text: str) -> None:
+        self.tb = tb
+        self.debug = debug
+        self.message = message
+        self.text = text
+    
+    def __reduce__(self) -> Any:
+        # Tracebacks cannot be pickled; drop the cache, not the exception
+        return (type(None), ())
+
+
 def format_middleware_trace(error: Exception) -> str:
     """
     Format a traceback with middleware-specific highlighting and filtering.
@@ -109,49 +151,104 @@ def format_middleware_trace(error: Exception) -> str:
     This provides cleaner stack traces that highlight relevant middleware code
     and filter out framework internals.
     """
-    tb_lines = traceback.format_exception(type(error), error, error.__traceback__)
+    tb = error.__traceback__
+    debug = getattr(sys, "mware_debug", False)
     
-    formatted_lines = []
+    # The same exception is often formatted more than once on its way out.
+    # The text is stored on the exception itself, so it lives exactly as long
+    # as the error, and is reused while the traceback, the debug flag and the
+    # rendered message are unchanged; a re-raise extends the traceback, and
+    # e.g. add_suggestion() changes the message, so both miss.
+    message = str(error)
+    cached: Optional[_FormattedTrace] = getattr(error, "_mware_trace", None)
+    if (cached is not None and cached.tb is tb and cached.debug == debug
+            and cached.message == message):
+        return cached.text
+    
+    tb_lines = traceback.format_exception(type(error), error, tb)
+    
+    formatted_lines: List[str] = []
+    append = formatted_lines.append  # bound once, called per line
     in_middleware = False
     
     for line in tb_lines:
         # Highlight lines from the mware package
         if "mware/" in line:
             if not in_middleware:
-                formatted_lines.append("  ━━━ Middleware Stack ━━━\n")
+                append("  ━━━ Middleware Stack ━━━\n")
                 in_middleware = True
-            formatted_lines.append(f"  → {line}")
+            append(f"  → {line}")
         else:
             if in_middleware:
-                formatted_lines.append("  ━━━━━━━━━━━━━━━━━━━━━━━\n")
+                append("  ━━━━━━━━━━━━━━━━━━━━━━━\n")
                 in_middleware = False
             # Filter out asyncio internals unless in debug mode
-            if "asyncio" not in line or getattr(sys, "mware_debug", False):
-                formatted_lines.append(line)
+            if debug or "asyncio" not in line:
+                append(line)
     
-    return "".join(formatted_lines)
+    trace = "".join(formatted_lines)
+    try:
+        error._mware_trace = _FormattedTrace(tb, debug, message, trace)  # type: ignore[attr-defined]
+    except AttributeError:  # exception type without a __dict__
+        pass
+    return trace
+
+
+def _write_error(error: Exception, traced: Exception,
+                 log_errors: bool, include_trace: bool) -> None:
+    """Write an error message and/or trace to stderr in a single write."""
+    parts = []
+    if log_errors:
+        parts.append(str(error))
+    if include_trace:
+        parts.append(format_middleware_trace(traced))
+    if parts:
+        parts.append("")
+        sys.stderr.write("\n".join(parts))
+
+
+if sys.version_info >= (3, 9):
+    _to_thread = asyncio.to_thread
+else:  # Python 3.8
+    async def _to_thread(func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func`` in the default executor, as ``asyncio.to_thread`` does."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args)
+        return await loop.run_in_executor(None, call)
 
 
 def create_error_handler(
     fallback: Optional[Callable[[Exception], Any]] = None,
     log_errors: bool = True,
     include_trace: bool = True,
+    offload_fallback: bool = False,
 ) -> Callable:
     """
     Create a middleware error handler with customizable behavior.
     
     This is useful for creating application-wide error handling middleware.
+    
+    ``fallback`` may be a coroutine function, in which case it is awaited.
+    Set ``offload_fallback`` for a sync fallback that blocks (e.g. reporting
+    over the network) to run it in a worker thread instead of on the loop.
     """
+    # How to call the fallback is fixed by the configuration, so decide once
+    fallback_is_async = asyncio.iscoroutinefunction(fallback)
+    
+    async def run_fallback(fallback: Callable[[Exception], Any], error: Exception) -> Any:
+        if fallback_is_async:
+            return await fallback(error)
+        if offload_fallback:
+            return await _to_thread(fallback, error)
+        return fallback(error)
+    
     async def error_handler_middleware(ctx: "Context", next: Callable) -> Any:
         try:
             return await next(ctx)
         except MiddlewareError as e:
-            if log_errors:
-                print(str(e), file=sys.stderr)
-            if include_trace:
-                print(format_middleware_trace(e), file=sys.stderr)
+            _write_error(e, e, log_errors, include_trace)
             if fallback:
-                return fallback(e)
+                return await run_fallback(fallback, e)
             raise
         except Exception as e:
             # Wrap non-middleware errors
@@ -162,69 +259,105 @@ def create_error_handler(
             wrapped.add_debug_info("original_type", type(e).__name__)
             wrapped.add_debug_info("original_message", str(e))
             
-            if log_errors:
-                print(str(wrapped), file=sys.stderr)
-            if include_trace:
-                print(format_middleware_trace(e), file=sys.stderr)
+            _write_error(wrapped, e, log_errors, include_trace)
             if fallback:
-                return fallback(wrapped)
+                return await run_fallback(fallback, wrapped)
             raise wrapped from e
     
     return error_handler_middleware
 
 
+class _TracebackSnapshot:
+    """A reported traceback, rendered to text the first time it is read."""
+    
+    __slots__ = ("_exception", "_text")
+    
+    def __init__(self, error: BaseException) -> None:
+        # Summarizes the stack without holding frames or their locals;
+        # source lines are looked up only when the text is rendered
+        self._exception: Optional[traceback.TracebackException] = traceback.TracebackException(
+            type(error), error, error.__traceback__, lookup_lines=False
+        )
+        self._text = ""
+    
+    def __str__(self) -> str:
+        if self._exception is not None:
+            self._text = "".join(self._exception.format())
+            self._exception = None
+        return self._text
+    
+    def __repr__(self) -> str:
+        return str(self)
+
+
 class ErrorReporter:
     """
     Advanced error reporting with telemetry and debugging capabilities.
+    
+    Keeps the most recent ``max_history`` reports. A report stores a
+    frame-free traceback snapshot; it is rendered to the entry's
+    ``"traceback"`` string when the history is next read.
     """
     
-    def __init__(self, app_name: str = "mware_app"):
+    def __init__(self, app_name: str = "mware_app", max_history: int = 1000):
         self.app_name = app_name
         self.error_count = 0
-        self.error_history: List[Dict[str, Any]] = []
+        self._history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        # Newest entries whose traceback is still a snapshot
+        self._unrendered = 0
+        # Counted as reported, so totals still cover entries that have
+        # dropped out of the bounded history
+        self._type_counts: Counter[str] = Counter()
         
     def report(self, error: Exception) -> None:
         """Report an error with full context."""
         self.error_count += 1
+        error_type = type(error).__name__
         
         error_data = {
             "count": self.error_count,
-            "type": type(error).__name__,
+            "type": error_type,
             "message": error.args[0] if error.args else "",
-            "traceback": traceback.format_exc(),
+            "traceback": _TracebackSnapshot(error),
             "metadata": getattr(error, "metadata", {}),
         }
         
         if isinstance(error, MiddlewareError):
             error_data.update({
-                "suggestions": error._suggestions,
-                "debug_info": error._debug_info,
-                "related_errors": [str(e) for e in error._related_errors],
+                "suggestions": error._suggestions or [],
+                "debug_info": error._debug_info or {},
+                "related_errors": [str(e) for e in error._related_errors or ()],
             })
         
-        self.error_history.append(error_data)
+        self._history.append(error_data)
+        self._unrendered += 1
+        self._type_counts[error_type] += 1
         
         # In production, this would send to error tracking service
         if getattr(sys, "mware_debug", False):
-            print(f"\n{'='*50}")
-            print(f"Error Report #{self.error_count} - {self.app_name}")
-            print(f"{'='*50}")
-            for key, value in error_data.items():
-                if key != "traceback":
-                    print(f"{key}: {value}")
-            print(f"{'='*50}\n")
+            rule = "=" * 50
+            lines = [f"\n{rule}", f"Error Report #{self.error_count} - {self.app_name}", rule]
+            lines.extend([f"{key}: {value}" for key, value in error_data.items() if key != "traceback"])
+            lines.append(f"{rule}\n\n")
+            sys.stdout.write("\n".join(lines))
+    
+    @property
+    def error_history(self) -> Deque[Dict[str, Any]]:
+        """Reported entries, oldest first, with their tracebacks as strings."""
+        history = self._history
+        size = len(history)
+        for i in range(size - min(self._unrendered, size), size):
+            entry = history[i]
+            entry["traceback"] = str(entry["traceback"])
+        self._unrendered = 0
+        return history
     
     def get_report_summary(self) -> Dict[str, Any]:
         """Get a summary of all reported errors."""
-        error_types = {}
-        for error in self.error_history:
-            error_type = error["type"]
-            error_types[error_type] = error_types.get(error_type, 0) + 1
-            
         return {
             "total_errors": self.error_count,
-            "error_types": error_types,
-            "last_error": self.error_history[-1] if self.error_history else None,
+            "error_types": dict(self._type_counts),
+            "last_error": self.error_history[-1] if self._history else None,
         }
 
 
@@ -2,8 +2,11 @@
 Tests for the Context object implementation.
 """
 
+import weakref
+
 import pytest
 from mware.context import Context
+from mware.errors import ContextError
 
 
 class TestContext:
@@ -85,6 +88,11 @@ class TestContext:
         ctx.update(a=10, d=4)
         assert ctx.a == 10
         assert ctx.d == 4
+        
+        ctx.update({'a': 20, 'e': 5}, f=6)
+        assert ctx.a == 20
+        assert ctx.e == 5
+        assert ctx.f == 6
     
     def test_clear_method(self):
         """Test clear method."""
@@ -127,6 +135,23 @@ class TestContext:
         ctx2.b.append(4)
         assert ctx1.b == [1, 2, 3, 4]  # Original changed (shallow copy)
     
+    def test_fork(self):
+        """Test forking a context with overrides."""
+        ctx1 = Context(a=1, b=2)
+        ctx1._metadata["trace"] = "t1"
+        ctx2 = ctx1.fork(b=3, url="http://example.com")
+        
+        assert ctx2 is not ctx1
+        assert ctx2.a == 1
+        assert ctx2.b == 3
+        assert ctx2.url == "http://example.com"
+        assert ctx2._metadata == {"trace": "t1"}
+        
+        # The original is untouched
+        assert ctx1.b == 2
+        assert "url" not in ctx1
+        assert ctx1._metadata is not ctx2._metadata
+    
     def test_string_representations(self):
         """Test string and repr methods."""
         ctx = Context(user_id=123, is_admin=True)
@@ -185,4 +210,55 @@ class TestContext:
         assert ctx.a == 1
         assert ctx.b == 2
         assert ctx.c == 3
-        assert ctx.d == 4
\ No newline at end of file
+        assert ctx.d == 4
+    
+    def test_private_attributes_hidden(self):
+        """Test that underscore attributes stay out of the public data."""
+        ctx = Context(a=1)
+        ctx._internal = "hidden"
+        
+        assert ctx._internal == "hidden"
+        assert ctx.keys() == ["a"]
+        assert ctx.items() == [("a", 1)]
+        assert repr(ctx) == "Context({'a': 1})"
+        
+        ctx.clear()
+        assert ctx.keys() == []
+        assert ctx._internal == "hidden"
+        assert "_internal" not in ctx
+    
+    def test_method_names_rejected_as_attributes(self):
+        """Test that method names cannot be used as attribute names."""
+        ctx = Context(a=1)
+        
+        with pytest.raises(ContextError):
+            Context(keys='x')
+        with pytest.raises(ContextError):
+            ctx.set('get', 1)
+        with pytest.raises(ContextError):
+            ctx.update(items=[1, 2])
+        with pytest.raises(ContextError):
+            ctx.update({'update': 1})
+        with pytest.raises(ContextError):
+            ctx.fork(copy=True)
+        
+        assert ctx.keys() == ['a']
+    
+    def test_assigned_attributes_named_like_methods(self):
+        """Test that plain assignment shadowing method names does not break them."""
+        ctx = Context()
+        ctx.items = [1, 2]
+        ctx.keys = 'x'
+        
+        assert repr(ctx) == "Context({'items': [1, 2], 'keys': 'x'})"
+        assert str(ctx) == "Context(items=[1, 2], keys='x')"
+        
+        ctx.clear()
+        assert "items" not in ctx
+        assert "keys" not in ctx
+    
+    def test_context_is_weak_referenceable(self):
+        """Test that contexts can be weakly referenced."""
+        ctx = Context()
+        
+        assert weakref.ref(ctx)() is ctx
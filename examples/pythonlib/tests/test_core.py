@@ -3,10 +3,17 @@ Tests for the core middleware implementation.
 """
 
 import asyncio
+import functools
+import sys
+import types
 import pytest
 from unittest.mock import Mock, AsyncMock
 
-from mware.core import middleware
+from mware.context import Context
+from mware.core import _CHAINS, compile_chain, middleware, use_uvloop
+
+# Unlike the other test modules, async tests here keep a loop per test: the
+# sync tests call asyncio.run(), which leaves no current loop to share.
 
 
 class TestMiddlewareDecorator:
@@ -77,6 +84,27 @@ class TestMiddlewareDecorator:
         assert result == 'async_result'
         assert calls == ['log_before', 'async_handler', 'log_after']
     
+    @pytest.mark.asyncio
+    async def test_sync_middleware_with_async_handler_in_running_loop(self):
+        """Test sync middleware over an async handler inside a running loop."""
+        calls = []
+        
+        @middleware
+        def pass_through_middleware(ctx, next):
+            calls.append('before')
+            return next(ctx)
+        
+        @pass_through_middleware
+        async def handler(ctx):
+            calls.append('async_handler')
+            return 'async_result'
+        
+        # asyncio.run() cannot nest, so the coroutine is handed back to await
+        result = await handler()
+        
+        assert result == 'async_result'
+        assert calls == ['before', 'async_handler']
+    
     @pytest.mark.asyncio
     async def test_async_middleware_with_sync_handler(self):
         """Test asynchronous middleware wrapping a synchronous handler."""
@@ -137,6 +165,166 @@ class TestMiddlewareDecorator:
             'first_after'
         ]
     
+    @pytest.mark.asyncio
+    async def test_async_middleware_chaining(self):
+        """Test stacked async middleware runs in order around the handler."""
+        calls = []
+        
+        @middleware
+        async def first_middleware(ctx, next):
+            calls.append('first_before')
+            result = await next(ctx)
+            calls.append('first_after')
+            return result
+        
+        @middleware
+        async def second_middleware(ctx, next):
+            calls.append('second_before')
+            result = await next(ctx)
+            calls.append('second_after')
+            return result
+        
+        @middleware
+        async def third_middleware(ctx, next):
+            calls.append('third_before')
+            result = await next(ctx)
+            calls.append('third_after')
+            return result
+        
+        @first_middleware
+        @second_middleware
+        @third_middleware
+        async def handler(ctx, value, suffix=''):
+            calls.append('handler')
+            return f'{value}{suffix}'
+        
+        result = await handler('result', suffix='!')
+        
+        assert result == 'result!'
+        assert calls == [
+            'first_before',
+            'second_before',
+            'third_before',
+            'handler',
+            'third_after',
+            'second_after',
+            'first_after'
+        ]
+        assert handler.__name__ == 'handler'
+    
+    @pytest.mark.asyncio
+    async def test_async_middleware_chaining_with_sync_handler(self):
+        """Test stacked async middleware can call next more than once."""
+        calls = []
+        
+        @middleware
+        async def twice_middleware(ctx, next):
+            await next(ctx)
+            return await next(ctx)
+        
+        @middleware
+        async def tag_middleware(ctx, next):
+            ctx.tagged = True
+            return await next(ctx)
+        
+        @twice_middleware
+        @tag_middleware
+        def handler(ctx):
+            calls.append(ctx.tagged)
+            return len(calls)
+        
+        ctx = Context()
+        assert await handler(ctx) == 2
+        assert calls == [True, True]
+    
+    @pytest.mark.asyncio
+    async def test_async_middleware_over_sync_middleware_with_async_handler(self):
+        """Test async middleware awaits a sync-middleware-wrapped async handler."""
+        calls = []
+        
+        @middleware
+        async def async_middleware(ctx, next):
+            calls.append('async')
+            return await next(ctx)
+        
+        @middleware
+        def sync_middleware(ctx, next):
+            calls.append('sync')
+            return next(ctx)
+        
+        @async_middleware
+        @sync_middleware
+        async def handler(ctx):
+            calls.append('handler')
+            return 'result'
+        
+        @async_middleware
+        @async_middleware
+        @sync_middleware
+        async def chained_handler(ctx):
+            return 'chained'
+        
+        assert await handler() == 'result'
+        assert calls == ['async', 'sync', 'handler']
+        assert await chained_handler() == 'chained'
+    
+    @pytest.mark.asyncio
+    async def test_async_middleware_over_stacked_sync_middleware(self):
+        """Test async middleware awaits an async handler under two sync layers."""
+        calls = []
+        
+        @middleware
+        async def async_middleware(ctx, next):
+            calls.append('async')
+            return await next(ctx)
+        
+        @middleware
+        def sync_middleware(ctx, next):
+            calls.append('sync')
+            return next(ctx)
+        
+        @async_middleware
+        @sync_middleware
+        @sync_middleware
+        async def handler(ctx):
+            calls.append('handler')
+            return 'result'
+        
+        assert await handler() == 'result'
+        assert calls == ['async', 'sync', 'sync', 'handler']
+    
+    @pytest.mark.asyncio
+    async def test_async_middleware_chaining_keeps_other_decorators(self):
+        """Test that folding middleware never skips a decorator in between."""
+        calls = []
+        
+        @middleware
+        async def outer_middleware(ctx, next):
+            calls.append('outer')
+            return await next(ctx)
+        
+        @middleware
+        async def inner_middleware(ctx, next):
+            calls.append('inner')
+            return await next(ctx)
+        
+        def plain_decorator(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                calls.append('plain')
+                return await fn(*args, **kwargs)
+            return wrapper
+        
+        @outer_middleware
+        @plain_decorator
+        @inner_middleware
+        async def handler(ctx):
+            calls.append('handler')
+            return 'result'
+        
+        assert await handler() == 'result'
+        assert calls == ['outer', 'plain', 'inner', 'handler']
+    
     def test_middleware_with_arguments(self):
         """Test middleware handling handler arguments."""
         @middleware
@@ -150,6 +338,20 @@ class TestMiddlewareDecorator:
         result = handler('a', 'b', kwarg1='c')
         assert result == 'a-b-c'
     
+    @pytest.mark.asyncio
+    async def test_async_middleware_with_arguments(self):
+        """Test async middleware passing handler arguments through."""
+        @middleware
+        async def pass_through_middleware(ctx, next):
+            return await next(ctx)
+        
+        @pass_through_middleware
+        async def handler(ctx, arg1, arg2, kwarg1=None):
+            return f'{arg1}-{arg2}-{kwarg1}'
+        
+        result = await handler('a', 'b', kwarg1='c')
+        assert result == 'a-b-c'
+    
     def test_middleware_error_propagation(self):
         """Test that errors propagate through middleware chain."""
         @middleware
@@ -180,4 +382,92 @@ class TestMiddlewareDecorator:
             return 'hello'
         
         result = handler()
-        assert result == 'HELLO'
\ No newline at end of file
+        assert result == 'HELLO'
+    
+    def test_middleware_accepts_context_subclass(self):
+        """Test that a Context subclass is passed through, not wrapped."""
+        class RequestContext(Context):
+            pass
+        
+        @middleware
+        def pass_through_middleware(ctx, next):
+            return next(ctx)
+        
+        @pass_through_middleware
+        def handler(ctx, value):
+            return ctx, value
+        
+        ctx = RequestContext(user_id=1)
+        received, value = handler(ctx, 'x')
+        
+        assert received is ctx
+        assert value == 'x'
+
+
+class TestCompileChain:
+    """Test building a middleware chain in one step."""
+    
+    @pytest.mark.asyncio
+    async def test_compile_chain_runs_in_order(self):
+        """Test that the chain runs outermost-first like stacked decorators."""
+        calls = []
+        
+        async def first(ctx, next):
+            calls.append('first')
+            return await next(ctx)
+        
+        async def second(ctx, next):
+            calls.append('second')
+            return await next(ctx)
+        
+        async def handler(ctx, value):
+            calls.append('handler')
+            return value
+        
+        chained = compile_chain(first, second, handler=handler)
+        
+        assert await chained('result') == 'result'
+        assert calls == ['first', 'second', 'handler']
+        assert _CHAINS[chained] == ((first, second), handler)
+        assert chained.__name__ == 'handler'
+    
+    def test_compile_chain_with_sync_middleware(self):
+        """Test that sync middleware chains still nest correctly."""
+        def double(ctx, next):
+            return next(ctx) * 2
+        
+        def increment(ctx, next):
+            return next(ctx) + 1
+        
+        chained = compile_chain(double, increment, handler=lambda ctx: 1)
+        
+        assert chained() == 4
+    
+    def test_compile_chain_requires_middleware(self):
+        """Test that an empty chain is rejected."""
+        with pytest.raises(ValueError):
+            compile_chain(handler=lambda ctx: None)
+
+
+class TestUseUvloop:
+    """Test the use_uvloop helper."""
+    
+    def test_use_uvloop_without_uvloop(self, monkeypatch):
+        """Test that the default loop is kept when uvloop is missing."""
+        monkeypatch.setitem(sys.modules, 'uvloop', None)
+        set_policy = Mock()
+        monkeypatch.setattr(asyncio, 'set_event_loop_policy', set_policy)
+        
+        assert use_uvloop() is False
+        set_policy.assert_not_called()
+    
+    def test_use_uvloop_installs_policy(self, monkeypatch):
+        """Test that uvloop's policy is installed when available."""
+        fake_uvloop = types.ModuleType('uvloop')
+        fake_uvloop.EventLoopPolicy = Mock(return_value='policy')
+        monkeypatch.setitem(sys.modules, 'uvloop', fake_uvloop)
+        set_policy = Mock()
+        monkeypatch.setattr(asyncio, 'set_event_loop_policy', set_policy)
+        
+        assert use_uvloop() is True
+        set_policy.assert_called_once_with('policy')
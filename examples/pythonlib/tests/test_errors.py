@@ -2,7 +2,13 @@
 Tests for the error handling and error classes.
 """
 
+import gc
+import json
+import pickle
 import sys
+import threading
+import traceback
+import weakref
 import pytest
 from typing import Callable
 from mware.errors import (
@@ -78,6 +84,20 @@ class TestMiddlewareError:
         assert len(error._suggestions) == 1
         assert error._debug_info["key"] == "value"
         assert len(error._related_errors) == 1
+    
+    def test_error_pickle_roundtrip(self):
+        """Test that slot-stored details survive pickling."""
+        error = ValidationError("Bad value", field="email", user_id=123)
+        error.add_suggestion("Check the format")
+        
+        restored = pickle.loads(pickle.dumps(error))
+        
+        assert type(restored) is ValidationError
+        assert restored.message == "Bad value"
+        assert restored.metadata["user_id"] == 123
+        assert restored._suggestions == ["Check the format"]
+        assert restored._debug_info["validation_field"] == "email"
+        assert str(restored) == str(error)
 
 
 class TestSpecializedErrors:
@@ -129,7 +149,61 @@ class TestErrorHandling:
             trace = format_middleware_trace(e)
             assert "MiddlewareError: Test error" in trace
     
-    @pytest.mark.asyncio
+    def test_format_middleware_trace_reuses_output(self, monkeypatch):
+        """Test that a trace is formatted once per exception and traceback."""
+        calls = []
+        format_exception = traceback.format_exception
+        
+        def counting_format_exception(*args):
+            calls.append(args)
+            return format_exception(*args)
+        
+        monkeypatch.setattr(traceback, "format_exception", counting_format_exception)
+        
+        try:
+            raise ValueError("Test error")
+        except ValueError as e:
+            error = e
+        
+        first = format_middleware_trace(error)
+        assert format_middleware_trace(error) == first
+        assert len(calls) == 1
+        
+        # Re-raising extends the traceback, so the trace is rebuilt
+        try:
+            raise error
+        except ValueError:
+            pass
+        format_middleware_trace(error)
+        assert len(calls) == 2
+    
+    def test_format_middleware_trace_after_adding_suggestion(self):
+        """Test that a cached trace is rebuilt when the error message changes."""
+        try:
+            raise ValidationError("Invalid email", field="email")
+        except ValidationError as e:
+            error = e
+        
+        assert "Use a valid address" not in format_middleware_trace(error)
+        
+        error.add_suggestion("Use a valid address")
+        
+        assert "Use a valid address" in format_middleware_trace(error)
+    
+    def test_format_middleware_trace_keeps_error_picklable(self):
+        """Test that a formatted exception can still be pickled."""
+        try:
+            raise ValueError("Test error")
+        except ValueError as e:
+            error = e
+        
+        format_middleware_trace(error)
+        restored = pickle.loads(pickle.dumps(error))
+        
+        assert restored.args == ("Test error",)
+        assert "ValueError: Test error" in format_middleware_trace(restored)
+    
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_error_handler_middleware(self):
         """Test the error handler middleware factory."""
         fallback_called = False
@@ -172,7 +246,7 @@ class TestErrorHandling:
         assert result == "fallback"
         assert fallback_called
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_error_handler_reraise(self):
         """Test error handler that re-raises errors."""
         error_handler = create_error_handler(
@@ -187,6 +261,66 @@ class TestErrorHandling:
         ctx = Context()
         with pytest.raises(MiddlewareError):
             await error_handler(ctx, error_next)
+    
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_error_handler_awaits_async_fallback(self):
+        """Test that a coroutine fallback is awaited."""
+        async def fallback_handler(error):
+            return f"fallback: {error.message}"
+        
+        error_handler = create_error_handler(
+            fallback=fallback_handler, log_errors=False, include_trace=False
+        )
+        
+        async def error_next(ctx):
+            raise MiddlewareError("Test error")
+        
+        assert await error_handler(Context(), error_next) == "fallback: Test error"
+    
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_error_handler_offloads_sync_fallback(self):
+        """Test that offload_fallback runs a sync fallback off the loop thread."""
+        fallback_threads = []
+        
+        def fallback_handler(error):
+            fallback_threads.append(threading.get_ident())
+            return "fallback"
+        
+        error_handler = create_error_handler(
+            fallback=fallback_handler, log_errors=False, include_trace=False,
+            offload_fallback=True
+        )
+        
+        async def error_next(ctx):
+            raise ValueError("Test error")
+        
+        assert await error_handler(Context(), error_next) == "fallback"
+        assert len(fallback_threads) == 1
+        assert fallback_threads[0] != threading.get_ident()
+    
+    def test_error_handler_does_not_retain_fallback(self):
+        """Test that a fallback is released along with its handler."""
+        def fallback(error):
+            return None
+        
+        fallback_ref = weakref.ref(fallback)
+        handler = create_error_handler(fallback=fallback, log_errors=False)
+        
+        assert create_error_handler(fallback=fallback, log_errors=False) is not handler
+        
+        del fallback, handler
+        gc.collect()
+        assert fallback_ref() is None
+    
+    def test_error_handler_with_unhashable_fallback(self):
+        """Test that unhashable fallbacks still get a handler."""
+        class Fallback:
+            __hash__ = None
+            
+            def __call__(self, error):
+                return None
+        
+        assert callable(create_error_handler(fallback=Fallback()))
 
 
 class TestErrorReporter:
@@ -234,9 +368,75 @@ class TestErrorReporter:
         summary = reporter.get_report_summary()
         
         assert summary["total_errors"] == 3
-        assert summary["error_types"]["MiddlewareError"] == 2
-        assert summary["error_types"]["ValidationError"] == 1
+        # Counted as errors are reported, returned as a plain dict
+        assert type(summary["error_types"]) is dict
+        assert summary["error_types"] == {"MiddlewareError": 2, "ValidationError": 1}
         assert summary["last_error"]["message"] == "Error 3"
+        
+        # Type counts do not depend on walking the history
+        reporter.error_history.clear()
+        assert reporter.get_report_summary()["error_types"] == summary["error_types"]
+    
+    def test_history_evicts_oldest_entry(self):
+        """Test that the history keeps only the newest max_history reports."""
+        reporter = ErrorReporter("test_app", max_history=2)
+        
+        for i in range(3):
+            reporter.report(MiddlewareError(f"Error {i}"))
+        
+        assert [entry["message"] for entry in reporter.error_history] == ["Error 1", "Error 2"]
+        assert reporter.error_count == 3
+        assert reporter.get_report_summary()["error_types"] == {"MiddlewareError": 3}
+    
+    def test_report_summary_formats_traceback(self):
+        """Test that the last error's traceback is rendered for the summary."""
+        reporter = ErrorReporter("test_app")
+        
+        try:
+            raise MiddlewareError("Raised error")
+        except MiddlewareError as e:
+            reporter.report(e)
+        
+        traceback_text = reporter.get_report_summary()["last_error"]["traceback"]
+        assert type(traceback_text) is str
+        assert "Traceback (most recent call last)" in traceback_text
+        assert "test_report_summary_formats_traceback" in traceback_text
+    
+    def test_history_does_not_keep_frames(self):
+        """Test that a history entry does not keep the raising frames alive."""
+        reporter = ErrorReporter("test_app")
+        refs = []
+        
+        class Payload:
+            pass
+        
+        def fail():
+            payload = Payload()
+            refs.append(weakref.ref(payload))
+            raise MiddlewareError("Raised error")
+        
+        try:
+            fail()
+        except MiddlewareError as e:
+            reporter.report(e)
+        
+        assert refs[0]() is None
+        assert "in fail" in reporter.error_history[0]["traceback"]
+    
+    def test_history_tracebacks_are_strings(self):
+        """Test that history entries expose their traceback as a string."""
+        reporter = ErrorReporter("test_app")
+        
+        try:
+            raise MiddlewareError("Raised error")
+        except MiddlewareError as e:
+            reporter.report(e)
+        reporter.report(MiddlewareError("Not raised"))
+        
+        for entry in reporter.error_history:
+            assert isinstance(entry["traceback"], str)
+        assert "Traceback (most recent call last)" in reporter.error_history[0]["traceback"]
+        json.dumps(list(reporter.error_history))
     
     def test_debug_mode_output(self, capsys):
         """Test debug mode output."""